@@ -1,11 +1,11 @@
 """
-pygame Maze Game (coin-aware Dijkstra, full integration)
+pygame Maze Game (coin-aware A*, full integration)
 -------------------------------------------------
 - English-only interface
 - Tracks distance moved instead of score
 - Coins reduce total distance by 10 (bonus)
 - 2~4 coins per maze
-- Dijkstra with bitmask considers coins in pathfinding
+- A* search with bitmask considers coins in pathfinding
 - Press H for help (shows shortest path as bright blue line)
 
 Controls:
@@ -20,16 +20,27 @@ Written by ChatGPT
 import pygame
 import random
 import sys
-import math
 import heapq
+import threading
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # numba not installed: the array-based kernels still run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
 
 CELL_SIZE = 36
 GRID_W = 21
 GRID_H = 15
 FPS = 60
+MOVE_DELAY_MS = 180  # hold time before a direction key starts repeating
+MOVE_REPEAT_MS = 80  # step interval once it repeats
+INF = 10**9  # integer 'unreachable' distance (fits int32, usable under numba)
 
-CHAR_WALL = '■'
-CHAR_PATH = ' '
 CHAR_PLAYER = '•'
 CHAR_COIN = '©'
 CHAR_EXIT = '★'
@@ -39,90 +50,180 @@ TEXT_COLOR = (240, 240, 240)
 HUD_COLOR = (200, 200, 100)
 PATH_COLOR = (80, 200, 255)
 
+SOLVED_EVENT = pygame.USEREVENT + 1  # posted when the background solve finishes
+
+_DIRS = ((1,0), (-1,0), (0,1), (0,-1))
+
 # Maze generation (recursive backtracker)
 def make_maze(w, h):
-    maze = [[1 for _ in range(w)] for _ in range(h)]
-
-    def carve(x, y):
-        dirs = [(2,0),(-2,0),(0,2),(0,-2)]
-        random.shuffle(dirs)
-        for dx, dy in dirs:
+    maze = np.ones((h, w), dtype=np.uint8)
+    maze[1, 1] = 0
+
+    # explicit stack of (x, y, remaining shuffled directions) frames
+    dirs = [(2,0),(-2,0),(0,2),(0,-2)]
+    random.shuffle(dirs)
+    stack = [(1, 1, iter(dirs))]
+    while stack:
+        x, y, it = stack[-1]
+        for dx, dy in it:
             nx, ny = x + dx, y + dy
-            if 0 < nx < w - 1 and 0 < ny < h - 1 and maze[ny][nx] == 1:
-                maze[ny][nx] = 0
-                maze[y + dy//2][x + dx//2] = 0
-                carve(nx, ny)
-
-    maze[1][1] = 0
-    carve(1,1)
+            if 0 < nx < w - 1 and 0 < ny < h - 1 and maze[ny, nx] == 1:
+                maze[ny, nx] = 0
+                maze[y + dy//2, x + dx//2] = 0
+                dirs = [(2,0),(-2,0),(0,2),(0,-2)]
+                random.shuffle(dirs)
+                stack.append((nx, ny, iter(dirs)))
+                break
+        else:
+            stack.pop()
     return maze
 
 def place_coins(maze, n):
-    h, w = len(maze), len(maze[0])
-    empties = [(x,y) for y in range(h) for x in range(w) if maze[y][x] == 0 and not (x==1 and y==1)]
-    random.shuffle(empties)
-    return empties[:n]
-
-# Coin-aware Dijkstra with bitmask
-def dijkstra_with_coins(maze, start, end, coins):
-    h, w = len(maze), len(maze[0])
-    coin_indices = {tuple(c): i for i, c in enumerate(coins)}
-    total_states = 1 << len(coins)
-
-    dist = {}
-    pq = [(0, start[0], start[1], 0)]  # (distance, x, y, bitmask)
-    dist[(start[0], start[1], 0)] = 0
-
-    prev = {}
+    ys, xs = np.where(maze == 0)
+    keep = ~((xs == 1) & (ys == 1))
+    xs, ys = xs[keep], ys[keep]
+    idx = np.random.permutation(len(xs))[:n]
+    return list(zip(xs[idx].tolist(), ys[idx].tolist()))
+
+# Walking distance from every cell to the exit, ignoring coins (BFS)
+@njit(cache=True, nogil=True)
+def _exit_distances_nb(maze_u8, w, h, ex, ey):
+    d = np.full(w*h, w*h, dtype=np.int64)  # walls / unreachable: never on a route to the exit
+    queue = np.empty(w*h, dtype=np.int64)
+    end = ey*w + ex
+    d[end] = 0
+    queue[0] = end
+    head, tail = 0, 1
+    while head < tail:
+        cell = queue[head]
+        head += 1
+        # no bounds check: the maze border is solid wall
+        for ncell in (cell + 1, cell - 1, cell + w, cell - w):
+            if maze_u8[ncell] == 0 and d[ncell] == w*h:
+                d[ncell] = d[cell] + 1
+                queue[tail] = ncell
+                tail += 1
+    return d
+
+# Coin-aware A* with bitmask (numba kernel)
+# state index = ((y*w + x) << n_coins) | mask
+# h = walking distance to exit - 10 * coins not yet taken; it never over-estimates,
+# so once the heap's smallest f reaches the best exit cost found so far no
+# better route remains. The exit is terminal (h = 0 there).
+@njit(cache=True, nogil=True)
+def _dijkstra_nb(maze_u8, w, h, sx, sy, ex, ey, coin_xs, coin_ys, n_coins):
+    n_masks = 1 << n_coins
+    dist = np.full(w*h*n_masks, INF, dtype=np.int32)
+    prev = np.full(w*h*n_masks, -1, dtype=np.int32)
+
+    d_exit = _exit_distances_nb(maze_u8, w, h, ex, ey)
+
+    coin_bit = np.full(w*h, -1, dtype=np.int8)
+    for i in range(n_coins):
+        coin_bit[coin_ys[i]*w + coin_xs[i]] = i
+
+    # 10 * number of coins still available for each mask
+    unseen_bonus = np.empty(n_masks, dtype=np.int64)
+    for m in range(n_masks):
+        taken = 0
+        for i in range(n_coins):
+            taken += (m >> i) & 1
+        unseen_bonus[m] = 10 * (n_coins - taken)
+
+    # heap entries are single ints: ((distance + h) << 32) | state, so they
+    # order by f first; f may be negative, which the shift handles fine
+    start = (sy*w + sx) << n_coins
+    dist[start] = 0
+    pq = [((d_exit[sy*w + sx] - unseen_bonus[0]) << 32) | start]
+    best_state = -1
+    best_cost = INF
+
+    # bound once: plain-Python runs (no numba) resolve these as fast locals
+    push = heapq.heappush
+    pop = heapq.heappop
+    mask_bits = n_masks - 1
 
     while pq:
-        cost, x, y, mask = heapq.heappop(pq)
-        if (x, y) == end:
-            end_mask = mask
-            break
-        if dist.get((x, y, mask), math.inf) < cost:
+        key = pop(pq)
+        f = key >> 32
+        if f >= best_cost:
+            break  # h is admissible: nothing left can beat the best exit found
+        state = key & 0xFFFFFFFF
+        mask = state & mask_bits
+        cell = state >> n_coins
+        y = cell // w
+        x = cell - y*w
+        if x == ex and y == ey:
+            best_cost = f
+            best_state = state
+            continue
+        cost = f - (d_exit[cell] - unseen_bonus[mask])
+        if dist[state] < cost:
             continue
 
-        for dx, dy in [(1,0),(-1,0),(0,1),(0,-1)]:
+        # no bounds check: the maze border is solid wall
+        for dx, dy in _DIRS:
             nx, ny = x + dx, y + dy
-            if not (0 <= nx < w and 0 <= ny < h):
-                continue
-            if maze[ny][nx] == 1:
+            ncell = ny*w + nx
+            if maze_u8[ncell] == 1:
                 continue
 
             new_mask = mask
             new_cost = cost + 1
 
-            if (nx, ny) in coin_indices:
-                bit = 1 << coin_indices[(nx, ny)]
+            i = int(coin_bit[ncell])
+            if i >= 0:
+                bit = 1 << i
                 if not (mask & bit):
                     new_mask |= bit
                     new_cost -= 10  # coin reduces distance by 10
 
-            if new_cost < dist.get((nx, ny, new_mask), math.inf):
-                dist[(nx, ny, new_mask)] = new_cost
-                prev[(nx, ny, new_mask)] = (x, y, mask)
-                heapq.heappush(pq, (new_cost, nx, ny, new_mask))
-
-    # find minimal end state
-    best_mask = min(
-        [m for (ex, ey, m) in dist.keys() if (ex, ey) == end],
-        key=lambda mm: dist[(end[0], end[1], mm)],
-        default=None,
-    )
+            nstate = (ncell << n_coins) | new_mask
+            if new_cost < dist[nstate]:
+                if nx == ex and ny == ey:
+                    f = new_cost
+                else:
+                    f = new_cost + d_exit[ncell] - unseen_bonus[new_mask]
+                if f >= best_cost:
+                    continue
+                dist[nstate] = new_cost
+                prev[nstate] = state
+                push(pq, (f << 32) | nstate)
+
+    if best_state < 0:
+        return np.empty(0, dtype=np.int64), INF
+
+    length = 0
+    cur = best_state
+    while cur >= 0:
+        length += 1
+        cur = prev[cur]
+    path = np.empty(length, dtype=np.int64)
+    cur = best_state
+    for i in range(length - 1, -1, -1):
+        path[i] = cur >> n_coins
+        cur = prev[cur]
+    return path, best_cost
 
-    if best_mask is None:
-        return [], math.inf
+def dijkstra_with_coins(maze, start, end, coins):
+    maze_u8 = np.asarray(maze, dtype=np.uint8)
+    h, w = maze_u8.shape
+    assert (w*h) << len(coins) < 1 << 31  # states are stored in the int32 prev array
+    # the kernel relies on the wall border make_maze always leaves
+    assert maze_u8[0].all() and maze_u8[-1].all() and maze_u8[:, 0].all() and maze_u8[:, -1].all()
+    coin_xs = np.array([c[0] for c in coins], dtype=np.int64)
+    coin_ys = np.array([c[1] for c in coins], dtype=np.int64)
+
+    cells, cost = _dijkstra_nb(maze_u8.ravel(), w, h, start[0], start[1],
+                               end[0], end[1], coin_xs, coin_ys, len(coins))
+    if len(cells) == 0:
+        return [], INF
 
     path = []
-    cur = (end[0], end[1], best_mask)
-    while cur in prev:
-        path.append((cur[0], cur[1]))
-        cur = prev[cur]
-    path.append(start)
-    path.reverse()
-
-    return path, dist[(end[0], end[1], best_mask)]
+    for c in cells.tolist():
+        y, x = divmod(c, w)
+        path.append((x, y))
+    return path, int(cost)
 
 def key_to_dir(key):
     if key in [pygame.K_LEFT, pygame.K_a]: return (-1, 0)
@@ -131,10 +232,27 @@ def key_to_dir(key):
     if key in [pygame.K_DOWN, pygame.K_s]: return (0, 1)
     return None
 
-def draw_path(screen, path):
-    if len(path) < 2:
+def dir_held(keys, dir):
+    if dir == (-1, 0): return keys[pygame.K_LEFT] or keys[pygame.K_a]
+    if dir == (1, 0): return keys[pygame.K_RIGHT] or keys[pygame.K_d]
+    if dir == (0, -1): return keys[pygame.K_UP] or keys[pygame.K_w]
+    if dir == (0, 1): return keys[pygame.K_DOWN] or keys[pygame.K_s]
+    return False
+
+def render_glyph(font, ch, color):
+    # pre-rendered glyph plus the offset that centers it inside a cell
+    surf = font.render(ch, True, color).convert_alpha()
+    rect = surf.get_rect(center=(CELL_SIZE//2, CELL_SIZE//2))
+    return surf, rect.topleft
+
+def path_points(path):
+    # screen-space cell centers, computed once per level
+    half = CELL_SIZE//2
+    return [(x*CELL_SIZE + half, y*CELL_SIZE + half) for (x,y) in path]
+
+def draw_path(screen, points):
+    if len(points) < 2:
         return
-    points = [(x*CELL_SIZE + CELL_SIZE//2, y*CELL_SIZE + CELL_SIZE//2) for (x,y) in path]
     pygame.draw.lines(screen, PATH_COLOR, False, points, 5)
 
 def run_game_loop(screen, clock, font, hud_font):
@@ -145,34 +263,79 @@ def run_game_loop(screen, clock, font, hud_font):
     player_x, player_y = 1, 1
 
     exit_x, exit_y = grid_w-2, grid_h-2
-    if maze[exit_y][exit_x] == 1:
+    if maze[exit_y, exit_x] == 1:
         found = False
         for y in range(grid_h-2, 0, -1):
             for x in range(grid_w-2, 0, -1):
-                if maze[y][x] == 0:
+                if maze[y, x] == 0:
                     exit_x, exit_y = x, y
                     found = True
                     break
             if found: break
 
     coin_count = random.randint(2,4)
-    coins = place_coins(maze, coin_count)
+    coins = set(place_coins(maze, coin_count))
 
     distance = 0
     game_over = False
     win = False
     show_help = False
 
-    shortest_path, optimal_distance = dijkstra_with_coins(maze, (1,1), (exit_x, exit_y), coins)
+    # solve in the background so the level is playable immediately;
+    # help and the optimal distance show up once SOLVED_EVENT arrives
+    shortest_path_pts = []
+    optimal_distance = None
+    result = {}
+    level_coins = list(coins)  # snapshot: coins shrinks as the player collects them
+    def solve():
+        result['solve'] = dijkstra_with_coins(maze, (1,1), (exit_x, exit_y), level_coins)
+        pygame.event.post(pygame.event.Event(SOLVED_EVENT))
+    threading.Thread(target=solve, daemon=True).start()
 
     window_w = grid_w * CELL_SIZE
     hud_h = 80
     window_h = grid_h * CELL_SIZE + hud_h
 
+    coin_surf, (coin_ox, coin_oy) = render_glyph(font, CHAR_COIN, HUD_COLOR)
+    exit_surf, (exit_ox, exit_oy) = render_glyph(font, CHAR_EXIT, (120,220,120))
+    player_surf, (player_ox, player_oy) = render_glyph(font, CHAR_PLAYER, (220,120,120))
+
+    # walls and the static HUD line never change during a level
+    hud_y0 = grid_h*CELL_SIZE + 8
+    bg = pygame.Surface((window_w, window_h)).convert()
+    bg.fill(BG_COLOR)
+    for y in range(grid_h):
+        for x in range(grid_w):
+            if maze[y, x] != 1:
+                continue  # path cells are blank
+            bg.fill(TEXT_COLOR, (x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
+    hud2 = hud_font.render('Press H: Show/Hide Help  |  R: Restart  |  Q: Quit', True, HUD_COLOR)
+    bg.blit(hud2, (8, hud_y0+28))
+
+    # only repaint when something changed; block on input otherwise
+    dirty = True
+    held_dir = None   # most recently pressed direction while it stays held
+    next_move = 0     # ticks at which held_dir may step again
     while True:
-        for event in pygame.event.get():
+        taps = []     # one step per direction KEYDOWN, in order
+        if dirty:
+            events = pygame.event.get()
+        elif held_dir:
+            timeout = max(1, next_move - pygame.time.get_ticks())
+            events = [pygame.event.wait(timeout)] + pygame.event.get()
+        else:
+            events = [pygame.event.wait()] + pygame.event.get()
+
+        for event in events:
             if event.type == pygame.QUIT:
                 return 'quit'
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                dirty = True
+            if event.type == SOLVED_EVENT and 'solve' in result and optimal_distance is None:
+                shortest_path, optimal_distance = result['solve']
+                shortest_path_pts = path_points(shortest_path)
+                if show_help or game_over:
+                    dirty = True
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_q:
                     return 'quit'
@@ -182,54 +345,56 @@ def run_game_loop(screen, clock, font, hud_font):
                 if not game_over:
                     if event.key == pygame.K_h:
                         show_help = not show_help
+                        dirty = True
 
                     dir = key_to_dir(event.key)
                     if dir:
-                        dx,dy = dir
-                        nx,ny = player_x + dx, player_y + dy
-                        if 0 <= nx < grid_w and 0 <= ny < grid_h and maze[ny][nx] == 0:
-                            player_x, player_y = nx, ny
-                            distance += 1
-                            for c in coins[:]:
-                                if (player_x, player_y) == tuple(c):
-                                    coins.remove(c)
-                                    distance = max(0, distance - 10)  # coin reduces actual distance too
-                            if player_x == exit_x and player_y == exit_y:
-                                game_over = True
-                                win = True
-
-        screen.fill(BG_COLOR)
+                        taps.append(dir)
+                        held_dir = dir  # the latest press wins
+                        next_move = pygame.time.get_ticks() + MOVE_DELAY_MS
+
+        moves = taps
+        if held_dir and not game_over:
+            now = pygame.time.get_ticks()
+            if not dir_held(pygame.key.get_pressed(), held_dir):
+                held_dir = None
+            elif now >= next_move:
+                moves.append(held_dir)
+                next_move = now + MOVE_REPEAT_MS
+
+        for dx, dy in moves:
+            if game_over:
+                break
+            nx,ny = player_x + dx, player_y + dy
+            if 0 <= nx < grid_w and 0 <= ny < grid_h and maze[ny, nx] == 0:
+                player_x, player_y = nx, ny
+                distance += 1
+                dirty = True
+                pos = (player_x, player_y)
+                if pos in coins:
+                    coins.discard(pos)
+                    distance = max(0, distance - 10)  # coin reduces actual distance too
+                if player_x == exit_x and player_y == exit_y:
+                    game_over = True
+                    win = True
+                    held_dir = None  # stop repeat timeouts; the game-over screen idles
+
+        if not dirty:
+            continue
 
-        if show_help:
-            draw_path(screen, shortest_path)
+        screen.blit(bg, (0,0))
 
-        for y in range(grid_h):
-            for x in range(grid_w):
-                ch = CHAR_WALL if maze[y][x] == 1 else CHAR_PATH
-                pos = (x*CELL_SIZE, y*CELL_SIZE)
-                surf = font.render(ch, True, TEXT_COLOR)
-                rect = surf.get_rect()
-                rect.center = (pos[0] + CELL_SIZE//2, pos[1] + CELL_SIZE//2)
-                screen.blit(surf, rect)
+        if show_help:
+            draw_path(screen, shortest_path_pts)
 
         for (cx,cy) in coins:
-            surf = font.render(CHAR_COIN, True, HUD_COLOR)
-            rect = surf.get_rect(center=(cx*CELL_SIZE + CELL_SIZE//2, cy*CELL_SIZE + CELL_SIZE//2))
-            screen.blit(surf, rect)
-
-        surf_exit = font.render(CHAR_EXIT, True, (120,220,120))
-        rect_exit = surf_exit.get_rect(center=(exit_x*CELL_SIZE + CELL_SIZE//2, exit_y*CELL_SIZE + CELL_SIZE//2))
-        screen.blit(surf_exit, rect_exit)
+            screen.blit(coin_surf, (cx*CELL_SIZE + coin_ox, cy*CELL_SIZE + coin_oy))
 
-        surf_p = font.render(CHAR_PLAYER, True, (220,120,120))
-        rect_p = surf_p.get_rect(center=(player_x*CELL_SIZE + CELL_SIZE//2, player_y*CELL_SIZE + CELL_SIZE//2))
-        screen.blit(surf_p, rect_p)
+        screen.blit(exit_surf, (exit_x*CELL_SIZE + exit_ox, exit_y*CELL_SIZE + exit_oy))
+        screen.blit(player_surf, (player_x*CELL_SIZE + player_ox, player_y*CELL_SIZE + player_oy))
 
-        hud_y0 = grid_h*CELL_SIZE + 8
         hud1 = hud_font.render(f'Distance: {distance}   Coins left: {len(coins)}', True, TEXT_COLOR)
-        hud2 = hud_font.render('Press H: Show/Hide Help  |  R: Restart  |  Q: Quit', True, HUD_COLOR)
         screen.blit(hud1, (8, hud_y0))
-        screen.blit(hud2, (8, hud_y0+28))
 
         if game_over:
             overlay = pygame.Surface((window_w, window_h), pygame.SRCALPHA)
@@ -238,7 +403,10 @@ def run_game_loop(screen, clock, font, hud_font):
 
             msg = 'You Win! Reached the exit.' if win else 'Game Over'
             msg2 = f'Total distance: {distance}'
-            msg3 = f'Optimal distance (with coins): {optimal_distance}'
+            if optimal_distance is None:
+                msg3 = 'Optimal distance (with coins): solving...'
+            else:
+                msg3 = f'Optimal distance (with coins): {optimal_distance if optimal_distance < INF else "—"}'
             msg4 = 'Press R to Restart or Q to Quit'
             m1 = hud_font.render(msg, True, (255,255,255))
             m2 = hud_font.render(msg2, True, (200,200,200))
@@ -250,9 +418,10 @@ def run_game_loop(screen, clock, font, hud_font):
             screen.blit(m3, (window_w//2 - m3.get_width()//2, window_h//2))
             screen.blit(m4, (window_w//2 - m4.get_width()//2, window_h//2 + 30))
 
-            draw_path(screen, shortest_path)
+            draw_path(screen, shortest_path_pts)
 
         pygame.display.flip()
+        dirty = False
         clock.tick(FPS)
 
 def main():